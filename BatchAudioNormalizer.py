@@ -5,7 +5,12 @@
 
 import os
 import sys
-from pathlib import Path
+import functools
+import importlib.util
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 import numpy as np
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QPushButton, QLabel, QFileDialog, QProgressBar, QSlider, 
@@ -13,8 +18,451 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QH
 from PyQt5.QtCore import Qt, pyqtSignal, QThread
 from PyQt5.QtGui import QIcon, QColor, QPalette, QFont
 from pydub import AudioSegment
-import librosa
 import soundfile as sf
+import soxr
+from scipy.signal import sosfilt
+
+# Optional: Numba compiled kernels, NumPy equivalents are used when it isn't installed
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+@dataclass(frozen=True, slots=True)
+class JobConfig:
+    # Settings shared by every file of a batch
+    output_folder: str
+    target_format: str
+    target_level: float
+    normalize_method: str
+    bit_depth: int
+    stereo: bool
+    sample_rate: int
+
+
+# Input files picked up from the selected folder
+_AUDIO_EXTENSIONS = {".wav", ".mp3", ".ogg", ".flac", ".aiff", ".aif"}
+
+# numpy dtypes for the raw sample widths pydub can hand back
+_PCM_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+# Per worker thread state (cached soxr resamplers, read buffer)
+_THREAD_STATE = threading.local()
+
+
+if njit is not None:
+    @njit(fastmath=True, nogil=True, cache=True)
+    def _channel_stats(x):
+        # Peak and sum of squares of each column of a (frames, channels) array, in one pass
+        frames, channels = x.shape
+        peak = np.zeros(channels)
+        sum_squares = np.zeros(channels)
+        for i in range(frames):
+            for c in range(channels):
+                v = x[i, c]
+                sum_squares[c] += v * v
+                peak[c] = max(peak[c], abs(v))
+        return peak, sum_squares
+
+    @njit(fastmath=True, nogil=True, cache=True)
+    def _apply_gain(x, gain):
+        # Scales each column of a (frames, channels) array in place
+        frames, channels = x.shape
+        for i in range(frames):
+            for c in range(channels):
+                x[i, c] *= gain[c]
+
+    @njit(fastmath=True, nogil=True, cache=True)
+    def _peak_normalize(x, target_amplitude):
+        # Peak only kernel: no sums of squares, one gain for every channel
+        frames, channels = x.shape
+        peak = 0.0
+        for i in range(frames):
+            for c in range(channels):
+                peak = max(peak, abs(x[i, c]))
+        if peak > 0:
+            gain = np.float32(target_amplitude / peak)
+            for i in range(frames):
+                for c in range(channels):
+                    x[i, c] *= gain
+
+    @njit(fastmath=True, nogil=True, cache=True)
+    def _rms_normalize(x, target_rms):
+        # RMS only kernel: no peak tracking, one gain per channel
+        frames, channels = x.shape
+        sum_squares = np.zeros(channels)
+        for i in range(frames):
+            for c in range(channels):
+                sum_squares[c] += x[i, c] * x[i, c]
+        gain = np.ones(channels, dtype=np.float32)
+        for c in range(channels):
+            if sum_squares[c] > 0:
+                gain[c] = target_rms / np.sqrt(sum_squares[c] / frames)
+        for i in range(frames):
+            for c in range(channels):
+                x[i, c] *= gain[c]
+else:
+    def _channel_stats(x):
+        # Axis reductions only, no abs() or squared copies of the audio
+        peak = np.maximum(-x.min(axis=0), x.max(axis=0)).astype(np.float64)
+        sum_squares = np.einsum('ij,ij->j', x, x, dtype=np.float64)
+        return peak, sum_squares
+
+    def _apply_gain(x, gain):
+        x *= gain
+
+    def _peak_normalize(x, target_amplitude):
+        peak = max(-float(x.min()), float(x.max()))
+        if peak > 0:
+            x *= np.float32(target_amplitude / peak)
+
+    def _rms_normalize(x, target_rms):
+        rms = np.sqrt(np.einsum('ij,ij->j', x, x, dtype=np.float64) / len(x))
+        x *= np.divide(target_rms, rms, out=np.ones_like(rms), where=rms > 0).astype(np.float32)
+
+
+def _read_buffer(frames, channels):
+    # A (frames, channels) float32 buffer that the calling thread reuses for
+    # every file it decodes, growing it only when a longer file comes along
+    size = frames * channels
+    buffer = getattr(_THREAD_STATE, "read_buffer", None)
+    if buffer is None or buffer.size < size:
+        buffer = _THREAD_STATE.read_buffer = np.empty(size, dtype=np.float32)
+    return buffer[:size].reshape(frames, channels)
+
+
+def _load_audio(file_path, stereo, reuse_buffer=False):
+    # Returns float32 audio shaped (frames, channels), the layout soundfile and
+    # soxr use natively, so it is never transposed on the way through.
+    # With reuse_buffer the audio may live in this thread's read buffer, so it
+    # is only valid until the thread loads its next file.
+    try:
+        with sf.SoundFile(file_path) as f:
+            if reuse_buffer:
+                audio = f.read(out=_read_buffer(f.frames, f.channels))
+            else:
+                audio = f.read(dtype='float32', always_2d=True)
+            sr = f.samplerate
+    except sf.LibsndfileError:
+        # Formats libsndfile can't decode (e.g. mp3 on older builds) go through ffmpeg
+        segment = AudioSegment.from_file(file_path)
+        if segment.sample_width not in _PCM_DTYPES:
+            segment = segment.set_sample_width(4)
+        dtype = _PCM_DTYPES[segment.sample_width]
+        samples = np.frombuffer(segment.raw_data, dtype=dtype)
+        audio = samples.reshape(-1, segment.channels).astype(np.float32)
+        audio *= -1.0 / np.iinfo(dtype).min
+        sr = segment.frame_rate
+    
+    return _downmix(audio, stereo), sr
+
+
+def _compute_gain(normalize_method, target_level, peak, channel_rms, loudness):
+    # One gain for the whole file, or one gain per channel for RMS
+    if normalize_method == "peak":
+        # Peak normalization
+        target_amplitude = 10 ** (target_level / 20.0)
+        return target_amplitude / peak if peak > 0 else 1.0
+    
+    elif normalize_method == "rms":
+        # RMS normalization
+        target_rms = 10 ** (target_level / 20.0)
+        channel_rms = np.asarray(channel_rms, dtype=np.float64)
+        return np.divide(target_rms, channel_rms, out=np.ones_like(channel_rms),
+                         where=channel_rms > 0)
+    
+    elif normalize_method == "loudness":
+        # Loudness normalization (target level is in LUFS)
+        if not np.isfinite(loudness):
+            return 1.0
+        return 10 ** ((target_level - loudness) / 20)
+    
+    return 1.0
+
+
+@functools.lru_cache(maxsize=None)
+def _k_weighting(sr):
+    # BS.1770 K-weighting (high shelf "pre-filter" + RLB high pass) as second
+    # order sections, designed for any sample rate from the filter parameters
+    sections = []
+    for gain_db, q, fc, shelf in [(4.0, 1 / np.sqrt(2), 1500.0, True), (0.0, 0.5, 38.0, False)]:
+        A = 10 ** (gain_db / 40)
+        w0 = 2 * np.pi * fc / sr
+        alpha = np.sin(w0) / (2 * q)
+        cos_w0 = np.cos(w0)
+        if shelf:
+            b = [A * ((A + 1) + (A - 1) * cos_w0 + 2 * np.sqrt(A) * alpha),
+                 -2 * A * ((A - 1) + (A + 1) * cos_w0),
+                 A * ((A + 1) + (A - 1) * cos_w0 - 2 * np.sqrt(A) * alpha)]
+            a = [(A + 1) - (A - 1) * cos_w0 + 2 * np.sqrt(A) * alpha,
+                 2 * ((A - 1) - (A + 1) * cos_w0),
+                 (A + 1) - (A - 1) * cos_w0 - 2 * np.sqrt(A) * alpha]
+        else:
+            # BS.1770 uses a plain [1, -2, 1] numerator for the high pass
+            a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+            b = [a[0], -2 * a[0], a[0]]
+        sections.append(np.array(b + a) / a[0])
+    return np.array(sections)
+
+
+class _LoudnessMeter:
+    # BS.1770 integrated loudness in LUFS: K-weighted power over 400 ms blocks
+    # (75% overlap) with the -70 LUFS absolute and -10 LU relative gates.
+    # Audio is fed in (frames, channels) blocks so long files never need a
+    # full size filtered copy.
+    def __init__(self, sr, channels):
+        self.sos = _k_weighting(sr)
+        self.zi = np.zeros((len(self.sos), 2, channels))
+        self.hop = int(round(0.1 * sr))
+        self.hop_energy = []
+        self.pending = np.zeros(0)
+    
+    def feed(self, block):
+        filtered, self.zi = sosfilt(self.sos, block, axis=0, zi=self.zi)
+        energy = np.concatenate((self.pending, np.einsum('ij,ij->i', filtered, filtered)))
+        full = len(energy) // self.hop * self.hop
+        self.hop_energy.append(energy[:full].reshape(-1, self.hop).sum(axis=1))
+        self.pending = energy[full:]
+    
+    def loudness(self):
+        hop_energy = np.concatenate(self.hop_energy) if self.hop_energy else np.zeros(0)
+        if len(hop_energy) < 4:
+            # Shorter than one gating block, measure all of it
+            frames = len(hop_energy) * self.hop + len(self.pending)
+            power = (hop_energy.sum() + self.pending.sum()) / frames if frames else 0.0
+            return -0.691 + 10 * np.log10(power) if power > 0 else -np.inf
+        
+        block_power = np.convolve(hop_energy, np.ones(4), 'valid') / (4 * self.hop)
+        with np.errstate(divide='ignore'):
+            block_loudness = -0.691 + 10 * np.log10(block_power)
+        gated = block_loudness > -70
+        if not gated.any():
+            return -np.inf
+        relative_gate = -0.691 + 10 * np.log10(block_power[gated].mean()) - 10
+        gated &= block_loudness > relative_gate
+        return -0.691 + 10 * np.log10(block_power[gated].mean())
+
+
+def _downmix(block, stereo):
+    # (frames, channels) audio; mono output averages the channels
+    if stereo or block.shape[1] == 1:
+        return block
+    return block.mean(axis=1, keepdims=True, dtype=np.float32)
+
+
+def _quantize(audio, bit_depth):
+    # Converts float32 audio to the integer samples of a PCM_16/PCM_24 file with
+    # NumPy ufuncs, so libsndfile writes them as is. Works in place on audio.
+    if bit_depth not in (16, 24):
+        return audio
+    # Same scaling and clipping libsndfile applies to float input
+    full_scale = 2 ** (bit_depth - 1)
+    audio *= np.float32(full_scale)
+    np.floor(audio, out=audio)
+    np.clip(audio, -full_scale, full_scale - 1, out=audio)
+    if bit_depth == 16:
+        return audio.astype(np.int16)
+    # 24 bit samples go in the top bytes of an int32
+    pcm = audio.astype(np.int32)
+    pcm <<= 8
+    return pcm
+
+
+def _stream_normalize(in_path, out_path, config, blocksize=65536):
+    # Two passes over the file in fixed size blocks (measure, then scale and write),
+    # so memory use doesn't grow with the length of the file
+    with sf.SoundFile(in_path) as f:
+        channels = f.channels if config.stereo else 1
+        buffer = np.empty((blocksize, f.channels), dtype=np.float32)
+        
+        peak = 0.0
+        sum_squares = np.zeros(channels)
+        meter = None
+        if config.normalize_method == "loudness":
+            meter = _LoudnessMeter(f.samplerate, channels)
+        frames = 0
+        for block in f.blocks(out=buffer):
+            block = _downmix(block, config.stereo)
+            block_peak, block_sum_squares = _channel_stats(block)
+            peak = max(peak, float(block_peak.max()))
+            sum_squares += block_sum_squares
+            if meter is not None:
+                meter.feed(block)
+            frames += len(block)
+        
+        if frames == 0:
+            raise ValueError("file contains no audio")
+        channel_rms = np.sqrt(sum_squares / frames)
+        loudness = meter.loudness() if meter is not None else None
+        gain = _compute_gain(config.normalize_method, config.target_level,
+                             peak, channel_rms, loudness)
+        gain = np.full(channels, gain, dtype=np.float32)
+        
+        f.seek(0)
+        is_wav = config.target_format == "wav"
+        subtype = f'PCM_{config.bit_depth}' if is_wav else None
+        with sf.SoundFile(out_path, 'w', f.samplerate, channels, subtype=subtype) as out:
+            for block in f.blocks(out=buffer):
+                block = _downmix(block, config.stereo)
+                _apply_gain(block, gain)
+                out.write(_quantize(block, config.bit_depth) if is_wav else block)
+
+
+def _resample(audio, sr, sample_rate):
+    # The filter is designed once per rate pair and reused for later files
+    channels = audio.shape[1]
+    resamplers = getattr(_THREAD_STATE, "resamplers", None)
+    if resamplers is None:
+        resamplers = _THREAD_STATE.resamplers = {}
+    key = (sr, sample_rate, channels)
+    resampler = resamplers.get(key)
+    if resampler is None:
+        resampler = soxr.ResampleStream(sr, sample_rate, channels, dtype='float32', quality='HQ')
+        resamplers[key] = resampler
+    else:
+        resampler.clear()
+    return resampler.resample_chunk(np.ascontiguousarray(audio), last=True)
+
+
+def _write_mp3(output_file, audio, sample_rate, bitrate):
+    # Pipe raw float32 samples (frames, channels) straight into ffmpeg, no temp wav
+    channels = audio.shape[1]
+    interleaved = np.ascontiguousarray(audio, dtype='<f4')
+    command = [AudioSegment.converter, '-y', '-loglevel', 'error',
+               '-f', 'f32le', '-ar', str(sample_rate), '-ac', str(channels), '-i', 'pipe:0',
+               '-b:a', bitrate, output_file]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, stderr = process.communicate(memoryview(interleaved).cast('B'))
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+
+
+def _measure_gain(audio, normalize_method, target_level, sr):
+    # Per-channel float32 gains for (frames, channels) audio
+    frames, channels = audio.shape
+    peak = channel_rms = loudness = None
+    if normalize_method in ["peak", "rms"]:
+        channel_peak, sum_squares = _channel_stats(audio)
+        peak = float(channel_peak.max())
+        channel_rms = np.sqrt(sum_squares / frames)
+    elif normalize_method == "loudness":
+        meter = _LoudnessMeter(sr, channels)
+        for start in range(0, frames, 65536):
+            meter.feed(audio[start:start + 65536])
+        loudness = meter.loudness()
+    gain = _compute_gain(normalize_method, target_level, peak, channel_rms, loudness)
+    return np.full(channels, gain, dtype=np.float32)
+
+
+def _write_audio(output_file, audio, config):
+    if config.target_format == "wav":
+        sf.write(output_file, _quantize(audio, config.bit_depth), config.sample_rate,
+                 subtype=f'PCM_{config.bit_depth}')
+    elif config.target_format in ["flac", "ogg"]:
+        sf.write(output_file, audio, config.sample_rate)
+    elif config.target_format == "mp3":
+        _write_mp3(output_file, audio, config.sample_rate, f"{config.bit_depth * 8}k")
+
+
+def _output_path(file_path, config):
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(config.output_folder, f"{base_name}.{config.target_format}")
+
+
+def _assign_outputs(input_files, config):
+    # Inputs that map to the same output (track.wav and track.flac) keep their
+    # source extension in the name (track_wav.wav, track_flac.wav). Anything still
+    # clashing gets None so no two workers ever write the same file.
+    groups = {}
+    for file_path in input_files:
+        key = os.path.normcase(_output_path(file_path, config))
+        groups.setdefault(key, []).append(file_path)
+    
+    assignments = []
+    used = set()
+    for file_path in input_files:
+        output_file = _output_path(file_path, config)
+        if len(groups[os.path.normcase(output_file)]) > 1:
+            base_name, ext = os.path.splitext(os.path.basename(file_path))
+            output_file = os.path.join(config.output_folder,
+                                       f"{base_name}_{ext[1:]}.{config.target_format}")
+        key = os.path.normcase(output_file)
+        if key in used:
+            output_file = None
+        else:
+            used.add(key)
+        assignments.append((file_path, output_file))
+    return assignments
+
+
+def _cuda_available():
+    # torchaudio can be installed on top of a CPU-only torch build, and a broken
+    # install can fail with more than ImportError (e.g. OSError loading a DLL)
+    try:
+        import torch
+        import torchaudio
+    except Exception:
+        return False
+    return torch.cuda.is_available()
+
+
+def _make_kernel(config):
+    # Resolves the method and target level once per batch. The returned
+    # kernel(audio, sr) normalizes (frames, channels) audio in place.
+    normalize_method = config.normalize_method
+    target_level = config.target_level
+    if normalize_method == "peak":
+        target_amplitude = 10 ** (target_level / 20.0)
+        def kernel(audio, sr):
+            _peak_normalize(audio, target_amplitude)
+    elif normalize_method == "rms":
+        target_rms = 10 ** (target_level / 20.0)
+        def kernel(audio, sr):
+            _rms_normalize(audio, target_rms)
+    elif normalize_method == "loudness":
+        def kernel(audio, sr):
+            _apply_gain(audio, _measure_gain(audio, normalize_method, target_level, sr))
+    else:
+        def kernel(audio, sr):
+            pass
+    return kernel
+
+
+def _process_one(file_path, output_file, config, kernel=None):
+    file_name = os.path.basename(file_path)
+    try:
+        # Stream the file when nothing but a gain change is needed
+        if config.target_format in ["wav", "flac", "ogg"]:
+            try:
+                info = sf.info(file_path)
+            except sf.LibsndfileError:
+                info = None
+            if info is not None and info.samplerate == config.sample_rate:
+                _stream_normalize(file_path, output_file, config)
+                return file_name, None
+        
+        # Load audio file
+        audio, sr = _load_audio(file_path, config.stereo, reuse_buffer=True)
+        
+        # Normalize audio (gains are applied in place on the float32 buffer)
+        if kernel is None:
+            kernel = _make_kernel(config)
+        kernel(audio, sr)
+        normalized_audio = audio
+        
+        # Resample if needed
+        if sr != config.sample_rate:
+            normalized_audio = _resample(normalized_audio, sr, config.sample_rate)
+        
+        # Save the normalized audio
+        _write_audio(output_file, normalized_audio, config)
+        
+        return file_name, None
+        
+    except Exception as e:
+        return file_name, str(e)
+
 
 class AudioNormalizerWorker(QThread):
     progress_updated = pyqtSignal(int)
@@ -22,108 +470,144 @@ class AudioNormalizerWorker(QThread):
     finished = pyqtSignal()
     
     def __init__(self, input_files, output_folder, target_format, target_level, 
-                 normalize_method="peak", bit_depth=16, stereo=True, sample_rate=44100):
+                 normalize_method="peak", bit_depth=16, stereo=True, sample_rate=44100,
+                 max_workers=None, device="cpu"):
         super().__init__()
         self.input_files = input_files
-        self.output_folder = output_folder
-        self.target_format = target_format
-        self.target_level = target_level
-        self.normalize_method = normalize_method
-        self.bit_depth = bit_depth
-        self.stereo = stereo
-        self.sample_rate = sample_rate
+        self.config = JobConfig(output_folder, target_format, target_level, normalize_method,
+                                bit_depth, stereo, sample_rate)
+        self.max_workers = max_workers or os.cpu_count()
+        self.device = device
+        self.batch_size = 8
+        self._gpu_resamplers = {}
+        self._kernel = _make_kernel(self.config)
+        self.status_interval = 10
+        self._files_done = 0
+        self._last_progress = -1
         self.is_running = True
 
         
     def run(self):
+        try:
+            if self.device == "cuda" and not _cuda_available():
+                self.file_processed.emit("CUDA is not available, using the CPU")
+                self.device = "cpu"
+            
+            if self.device == "cuda":
+                self.run_gpu()
+            else:
+                self.run_pool()
+        finally:
+            self.finished.emit()
+        
+    def run_pool(self):
+        # The decoding, resampling and Numba kernels all release the GIL, so worker
+        # threads run in parallel without the start up and pickling cost of processes
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        process = functools.partial(_process_one, config=self.config, kernel=self._kernel)
+        futures = {}
+        for file_path, output_file in _assign_outputs(self.input_files, self.config):
+            if output_file is None:
+                self.report_file(file_path, "another input file has the same output name")
+            else:
+                futures[executor.submit(process, file_path, output_file)] = file_path
+        try:
+            for future in as_completed(futures):
+                if not self.is_running:
+                    break
+                
+                _, error = future.result()
+                self.report_file(futures[future], error)
+        finally:
+            executor.shutdown(cancel_futures=True)
+        
+    def run_gpu(self):
+        # Files are decoded and measured on the CPU, then gain and resampling run
+        # on the GPU for batches of files at once
         total_files = len(self.input_files)
-        for i, file_path in enumerate(self.input_files):
+        batch = []
+        assignments = _assign_outputs(self.input_files, self.config)
+        for i, (file_path, output_file) in enumerate(assignments):
             if not self.is_running:
                 break
-                
+            
             try:
-                file_name = os.path.basename(file_path)
-                base_name = os.path.splitext(file_name)[0]
-                output_file = os.path.join(self.output_folder, f"{base_name}.{self.target_format}")
-                
-                # Load audio file
-                audio, sr = librosa.load(file_path, sr=None, mono=not self.stereo)
-                
-                # Normalize audio
-                if self.normalize_method == "peak":
-                    # Peak normalization
-                    if audio.ndim > 1:
-                        max_amplitude = np.max(np.abs(audio))
-                    else:
-                        max_amplitude = np.max(np.abs(audio))
-                    
-                    target_amplitude = 10 ** (self.target_level / 20.0)
-                    normalized_audio = audio * (target_amplitude / max_amplitude) if max_amplitude > 0 else audio
-                
-                elif self.normalize_method == "rms":
-                    # RMS normalization
-                    target_rms = 10 ** (self.target_level / 20.0)
-                    
-                    if audio.ndim > 1:
-                        # Stereo
-                        current_rms_left = np.sqrt(np.mean(audio[0]**2))
-                        current_rms_right = np.sqrt(np.mean(audio[1]**2))
-                        gain_left = target_rms / current_rms_left if current_rms_left > 0 else 1.0
-                        gain_right = target_rms / current_rms_right if current_rms_right > 0 else 1.0
-                        normalized_audio = np.vstack((audio[0] * gain_left, audio[1] * gain_right))
-                    else:
-                        # Mono
-                        current_rms = np.sqrt(np.mean(audio**2))
-                        gain = target_rms / current_rms if current_rms > 0 else 1.0
-                        normalized_audio = audio * gain
-                
-                elif self.normalize_method == "loudness":
-                    # Loudness normalization (simplified LUFS-based approach)
-                    target_loudness = self.target_level
-                    
-                    # Measure current loudness (simplified approximation)
-                    if audio.ndim > 1:
-                        mono_audio = np.mean(audio, axis=0)
-                    else:
-                        mono_audio = audio
-                        
-                    # Simple loudness estimation
-                    current_loudness = 20 * np.log10(np.sqrt(np.mean(mono_audio**2))) - 23
-                    gain = 10**((target_loudness - current_loudness) / 20)
-                    normalized_audio = audio * gain
+                if output_file is None:
+                    raise ValueError("another input file has the same output name")
+                audio, sr = _load_audio(file_path, self.config.stereo)
+                gain = _measure_gain(audio, self.config.normalize_method,
+                                     self.config.target_level, sr)
+                batch.append((file_path, output_file, audio, sr, gain))
+            except Exception as e:
+                self.report_file(file_path, str(e))
+            
+            if len(batch) == self.batch_size or (batch and i + 1 == total_files):
+                self.process_gpu_batch(batch)
+                batch = []
+        
+    def process_gpu_batch(self, batch):
+        # Only files with the same sample rate and channel count can share a tensor
+        groups = {}
+        for item in batch:
+            _, _, audio, sr, _ = item
+            groups.setdefault((sr, audio.shape[1]), []).append(item)
+        
+        for (sr, _), items in groups.items():
+            try:
+                import torch
+                import torchaudio
                 
-                # Resample if needed
-                if sr != self.sample_rate:
-                    normalized_audio = librosa.resample(normalized_audio, orig_sr=sr, target_sr=self.sample_rate)
+                tensors = [torch.from_numpy(audio) for _, _, audio, _, _ in items]
+                lengths = [t.shape[0] for t in tensors]
+                padded = torch.nn.utils.rnn.pad_sequence(tensors, batch_first=True)
+                padded = padded.transpose(1, 2).to("cuda")
                 
-                # Save the normalized audio
-                if self.target_format in ["wav", "flac", "ogg"]:
-                    subtype = f'PCM_{self.bit_depth}' if self.target_format == "wav" else None
-                    sf.write(output_file, normalized_audio.T if audio.ndim > 1 else normalized_audio, 
-                             self.sample_rate, subtype=subtype)
-                elif self.target_format == "mp3":
-                    # For mp3 we need to convert to wav first, then use pydub
-                    temp_wav = os.path.join(self.output_folder, f"{base_name}_temp.wav")
-                    sf.write(temp_wav, normalized_audio.T if audio.ndim > 1 else normalized_audio, 
-                             self.sample_rate)
-                    
-                    # Convert to mp3 using pydub
-                    audio_segment = AudioSegment.from_wav(temp_wav)
-                    audio_segment.export(output_file, format="mp3", bitrate=f"{self.bit_depth * 8}k")
-                    
-                    # Remove temp file
-                    os.remove(temp_wav)
+                gains = torch.from_numpy(np.stack([gain for _, _, _, _, gain in items]))
+                padded.mul_(gains.to("cuda")[:, :, None])
                 
-                # Update progress
-                progress = int((i + 1) / total_files * 100)
-                self.progress_updated.emit(progress)
-                self.file_processed.emit(file_name)
+                sample_rate = self.config.sample_rate
+                if sr != sample_rate:
+                    resampler = self._gpu_resamplers.get(sr)
+                    if resampler is None:
+                        resampler = torchaudio.transforms.Resample(sr, sample_rate).to("cuda")
+                        self._gpu_resamplers[sr] = resampler
+                    padded = resampler(padded)
+                    lengths = [-(-length * sample_rate // sr) for length in lengths]
                 
+                # Back to (batch, frames, channels) so every file is contiguous
+                output = padded.transpose(1, 2).contiguous().cpu().numpy()
             except Exception as e:
-                print(f"Error processing {file_path}: {str(e)}")
-                self.file_processed.emit(f"ERROR: {file_name} - {str(e)}")
-        
-        self.finished.emit()
+                for file_path, _, _, _, _ in items:
+                    self.report_file(file_path, str(e))
+                continue
+            
+            for (file_path, output_file, _, _, _), normalized_audio, length in zip(
+                    items, output, lengths):
+                try:
+                    normalized_audio = normalized_audio[:length]
+                    _write_audio(output_file, normalized_audio, self.config)
+                    self.report_file(file_path)
+                except Exception as e:
+                    self.report_file(file_path, str(e))
+        
+    def report_file(self, file_path, error=None):
+        # Signals are coalesced so thousands of short files don't flood the UI
+        # event loop: progress only when the percentage changes, file names every
+        # status_interval files. Errors are always reported.
+        self._files_done += 1
+        total_files = len(self.input_files)
+        file_name = os.path.basename(file_path)
+        if error is not None:
+            print(f"Error processing {file_path}: {error}")
+            self.file_processed.emit(f"ERROR: {file_name} - {error}")
+        elif self._files_done % self.status_interval == 0 or self._files_done == total_files:
+            self.file_processed.emit(file_name)
+        
+        # Update progress
+        progress = self._files_done * 100 // total_files
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self.progress_updated.emit(progress)
         
     def stop(self):
         self.is_running = False
@@ -368,6 +852,27 @@ class AudioNormalizerApp(QMainWindow):
         stereo_layout.addWidget(self.stereo_check)
         options_layout.addLayout(stereo_layout)
         
+        # Worker threads
+        workers_layout = QHBoxLayout()
+        workers_label = QLabel("Worker Threads:")
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, os.cpu_count() or 1)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        workers_layout.addWidget(workers_label)
+        workers_layout.addWidget(self.workers_spin, 1)
+        options_layout.addLayout(workers_layout)
+        
+        # Processing device (CUDA needs torchaudio)
+        device_layout = QHBoxLayout()
+        device_label = QLabel("Processing Device:")
+        self.device_combo = QComboBox()
+        self.device_combo.addItems(["CPU"])
+        if importlib.util.find_spec("torchaudio") is not None:
+            self.device_combo.addItems(["CUDA"])
+        device_layout.addWidget(device_label)
+        device_layout.addWidget(self.device_combo, 1)
+        options_layout.addLayout(device_layout)
+        
         main_layout.addWidget(options_group)
         
         # Status and progress
@@ -402,10 +907,11 @@ class AudioNormalizerApp(QMainWindow):
             self.selected_folder = folder
             self.folder_label.setText(folder)
             
-            # Get all audio files
-            self.audio_files = []
-            for ext in ["*.wav", "*.mp3", "*.ogg", "*.flac", "*.aiff", "*.aif"]:
-                self.audio_files.extend(list(Path(folder).glob(ext)))
+            # Get all audio files (one directory scan, plain string paths)
+            with os.scandir(folder) as entries:
+                self.audio_files = [entry.path for entry in entries
+                                    if entry.is_file()
+                                    and os.path.splitext(entry.name)[1].lower() in _AUDIO_EXTENSIONS]
             
             if self.audio_files:
                 self.status_label.setText(f"Found {len(self.audio_files)} audio files")
@@ -429,6 +935,8 @@ class AudioNormalizerApp(QMainWindow):
         bit_depth = int(self.bit_combo.currentText())
         stereo = self.stereo_check.isChecked()
         sample_rate = int(self.sample_combo.currentText())
+        max_workers = self.workers_spin.value()
+        device = self.device_combo.currentText().lower()
         
         # Disable UI elements
         self.folder_button.setEnabled(False)
@@ -438,7 +946,7 @@ class AudioNormalizerApp(QMainWindow):
         # Start worker thread
         self.worker = AudioNormalizerWorker(
             self.audio_files, output_folder, target_format, 
-            target_level, normalize_method, bit_depth, stereo, sample_rate
+            target_level, normalize_method, bit_depth, stereo, sample_rate, max_workers, device
         )
         self.worker.progress_updated.connect(self.update_progress)
         self.worker.file_processed.connect(self.update_status)